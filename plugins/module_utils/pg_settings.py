@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: (c) 2018, Andrew Klychkov (@Andersson007) <aaklychkov@mail.ru>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Helpers to read and change PostgreSQL server configuration parameters."""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import re
+import time
+
+# To allow to set value like 1mb instead of 1MB, 1kb instead of 1kB, etc:
+SIZE_VAL_RE = re.compile(r'^(\d+)([kKmMgGtT]?[bB])$')
+SIZE_UNIT_SPELLING = {
+    'b': 'B',
+    'kb': 'kB',
+    'mb': 'MB',
+    'gb': 'GB',
+    'tb': 'TB',
+}
+
+# A number optionally followed by a size unit, e.g. 1024, 0.5, 1024kB, 1GB:
+PRETTY_VAL_RE = re.compile(r'^(\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*([kMGT]?B)?$')
+
+SIZE_UNIT_BYTES = {
+    'B': 1,
+    'kB': 1024,
+    'MB': 1024 ** 2,
+    'GB': 1024 ** 3,
+    'TB': 1024 ** 4,
+}
+
+# Positive values of settings measured in kB and MB are returned
+# in bytes as well, other values are returned as NULL:
+SETTINGS_QUERY = ("SELECT s.name, s.setting, s.unit, s.context, s.boot_val, "
+                  "current_setting(s.name) AS show_val, "
+                  "pg_conf_load_time() AS conf_load_time, "
+                  "CASE WHEN m.bytes IS NULL THEN NULL "
+                  "WHEN s.setting::bigint > 0 THEN s.setting::bigint * m.bytes END AS raw_bytes, "
+                  "CASE WHEN m.bytes IS NULL THEN NULL "
+                  "WHEN s.boot_val::bigint > 0 THEN s.boot_val::bigint * m.bytes END AS boot_bytes "
+                  "FROM pg_settings AS s "
+                  "LEFT JOIN (VALUES ('kB', 1024), ('MB', 1048576)) AS m (unit, bytes) "
+                  "ON m.unit = s.unit "
+                  "WHERE s.name = ANY(%(names)s)")
+
+# How many times and how often (in seconds) to recheck settings
+# while waiting for the current session to re-read the configuration:
+CONF_RELOAD_ATTEMPTS = 5
+CONF_RELOAD_DELAY = 0.1
+
+
+def get_settings(cursor, names):
+    """Get information about server configuration parameters.
+
+    Return a dictionary where keys are names of the parameters
+    and values are dictionaries with the current_val (as SHOW returns it),
+    raw_val, unit, boot_val, context and conf_load_time keys. Values of parameters
+    measured in kB and MB are converted to bytes and their unit is 'b'.
+    Nonexistent parameters are absent in the returned dictionary.
+
+    Args:
+        cursor (cursor) -- cursor object of psycopg2 library
+        names (list) -- names of the parameters
+    """
+    cursor.execute(SETTINGS_QUERY, {'names': list(names)})
+
+    settings = {}
+    for row in cursor.fetchall():
+        name, raw_val, unit, context, boot_val, current_val, conf_load_time, raw_bytes, boot_bytes = row
+
+        if current_val == 'True':
+            current_val = 'on'
+        elif current_val == 'False':
+            current_val = 'off'
+
+        if unit in ('kB', 'MB'):
+            if raw_bytes is not None:
+                raw_val = raw_bytes
+            if boot_bytes is not None:
+                boot_val = boot_bytes
+
+            unit = 'b'
+
+        settings[name] = {
+            'current_val': current_val,
+            'raw_val': raw_val,
+            'unit': unit,
+            'boot_val': boot_val,
+            'context': context,
+            'conf_load_time': conf_load_time,
+        }
+
+    return settings
+
+
+def get_reloaded_settings(cursor, names, conf_load_time):
+    """Get information about server configuration parameters after reload.
+
+    pg_reload_conf() makes the postmaster signal every session, including
+    the current one, to re-read the configuration before running its next
+    query. In rare cases the signal can come too late for that, so the
+    settings are queried again until the time the current session loaded
+    the configuration is later than the passed one.
+
+    Return the same dictionary as get_settings() or None if the session
+    has not re-read the configuration in time.
+
+    Args:
+        cursor (cursor) -- cursor object of psycopg2 library
+        names (list) -- names of the parameters
+        conf_load_time (datetime) -- time returned by reload_conf()
+    """
+    for attempt in range(CONF_RELOAD_ATTEMPTS):
+        if attempt:
+            time.sleep(CONF_RELOAD_DELAY)
+
+        settings = get_settings(cursor, names)
+        if all(info['conf_load_time'] > conf_load_time for info in settings.values()):
+            return settings
+
+    return None
+
+
+def reload_conf(cursor):
+    """Reload the server configuration.
+
+    Return the time the current session loaded the configuration
+    before the reload to pass it to get_reloaded_settings().
+    It is read in the same statement, so reloads initiated by other
+    clients before it are already taken into account.
+
+    Args:
+        cursor (cursor) -- cursor object of psycopg2 library
+    """
+    cursor.execute("SELECT pg_reload_conf(), pg_conf_load_time()")
+    return cursor.fetchone()[1]
+
+
+def alter_system(cursor, name, value):
+    """Change a server configuration parameter with ALTER SYSTEM.
+
+    The configuration is not reloaded.
+
+    Args:
+        cursor (cursor) -- cursor object of psycopg2 library
+        name (str) -- name of the parameter
+        value (str) -- value to set, 'default' removes the parameter
+            from postgresql.auto.conf
+    """
+    if str(value).lower() == 'default':
+        cursor.execute("ALTER SYSTEM SET %s = DEFAULT" % quote_name(name))
+    else:
+        # Escape percent signs in the name as the value is a query parameter:
+        query = "ALTER SYSTEM SET %s = %%s" % quote_name(name).replace('%', '%%')
+        cursor.execute(query, (str(value),))
+
+
+def quote_name(name):
+    """Quote a parameter name to use it in ALTER SYSTEM.
+
+    Names of custom parameters look like my_extension.my_param,
+    so every part of the name is quoted separately.
+
+    Args:
+        name (str) -- name of the parameter
+    """
+    return '.'.join('"%s"' % part.replace('"', '""') for part in name.split('.'))
+
+
+def pretty_to_bytes(pretty_val):
+    # The function returns a value in bytes
+    # if the value contains 'B', 'kB', 'MB', 'GB', 'TB'.
+    # Otherwise it returns the passed argument.
+
+    # It's sometimes possible to have an empty values
+    if not pretty_val:
+        return pretty_val
+
+    match = PRETTY_VAL_RE.match(pretty_val)
+    # Values like 'on', '-1', '10min', etc.
+    # do not make sense to parse further
+    if not match:
+        return pretty_val
+
+    num_part, suffix = match.groups()
+
+    if num_part.isdigit():
+        num_part = int(num_part)
+    else:
+        num_part = float(num_part)
+
+    if suffix:
+        return num_part * SIZE_UNIT_BYTES[suffix]
+
+    return num_part
+
+
+def normalize_size_unit(value):
+    # Convert a value like 1mb, 1Kb or 1b (Postgres does not support)
+    # to 1MB, 1kB or 1B. Other values are returned as is.
+    match = SIZE_VAL_RE.match(value)
+    if not match:
+        return value
+
+    num_part, unit = match.groups()
+    return num_part + SIZE_UNIT_SPELLING[unit.lower()]
+
+
+def is_same_value(value, current_val):
+    # Values like 64MB and 65536kB are the same, but a value
+    # without a unit is measured in the base unit of the setting
+    # (e.g. kB for work_mem), so compare values in bytes only
+    # if both of them contain a size unit or both do not.
+    if value == current_val:
+        return True
+
+    value_match = PRETTY_VAL_RE.match(value)
+    current_match = PRETTY_VAL_RE.match(current_val)
+    if not value_match or not current_match:
+        return False
+
+    if bool(value_match.group(2)) != bool(current_match.group(2)):
+        return False
+
+    return pretty_to_bytes(value) == pretty_to_bytes(current_val)
@@ -55,7 +55,9 @@ options:
     - login_db
   trust_input:
     description:
-    - If C(false), check whether values of parameters are potentially dangerous.
+    - If C(false), check whether the value of I(session_role) is potentially dangerous.
+    - I(name) and I(value) are not checked because they are always passed
+      to ALTER SYSTEM as a quoted identifier and a query parameter.
     - It makes sense to use C(false) only when SQL injections are possible.
     type: bool
     default: true
@@ -71,6 +73,12 @@ notes:
   not restarted and the value in pg_settings is not updated yet.
 - For some parameters restart of PostgreSQL server is required.
   See official documentation U(https://www.postgresql.org/docs/current/view-pg-settings.html).
+- Every task runs the module in a separate process, so connections cannot be reused
+  between tasks. The module checks the new value of a parameter on the same connection
+  when possible, but reconnects to check parameters with C(backend) or C(superuser-backend)
+  context and when the session has not re-read the configuration in time after the reload.
+  If the connection overhead matters, for example, when a remote server requires SSL,
+  consider using a connection pooler on the server side.
 seealso:
 - module: community.postgresql.postgresql_info
 - name: PostgreSQL server configuration
@@ -165,19 +173,18 @@ context:
   sample: user
 '''
 
-try:
-    from psycopg2.extras import DictCursor
-except Exception:
-    # psycopg2 is checked by connect_to_db()
-    # from ansible.module_utils.postgres
-    pass
-
-from copy import deepcopy
-
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.community.postgresql.plugins.module_utils.database import (
     check_input,
 )
+from ansible_collections.community.postgresql.plugins.module_utils.pg_settings import (
+    alter_system,
+    get_reloaded_settings,
+    get_settings,
+    is_same_value,
+    normalize_size_unit,
+    reload_conf,
+)
 from ansible_collections.community.postgresql.plugins.module_utils.postgres import (
     connect_to_db,
     ensure_required_libs,
@@ -188,22 +195,14 @@ from ansible.module_utils._text import to_native
 
 PG_REQ_VER = 90400
 
-# To allow to set value like 1mb instead of 1MB, etc:
-LOWERCASE_SIZE_UNITS = ("mb", "gb", "tb")
-
 # ===========================================
 # PostgreSQL module specific support methods.
 #
 
 
 def param_get(cursor, module, name):
-    query = ("SELECT name, setting, unit, context, boot_val "
-             "FROM pg_settings WHERE name = %(name)s")
     try:
-        cursor.execute(query, {'name': name})
-        info = cursor.fetchone()
-        cursor.execute("SHOW %s" % name)
-        val = cursor.fetchone()
+        info = get_settings(cursor, [name]).get(name)
 
     except Exception as e:
         module.fail_json(msg="Unable to get %s value due to : %s" % (name, to_native(e)))
@@ -213,118 +212,39 @@ def param_get(cursor, module, name):
                              "Please check its spelling or presence in your PostgreSQL version "
                              "(https://www.postgresql.org/docs/current/runtime-config.html)" % name)
 
-    raw_val = info['setting']
-    unit = info['unit']
-    context = info['context']
-    boot_val = info['boot_val']
-
-    if val[name] == 'True':
-        val[name] = 'on'
-    elif val[name] == 'False':
-        val[name] = 'off'
-
-    if unit == 'kB':
-        if int(raw_val) > 0:
-            raw_val = int(raw_val) * 1024
-        if int(boot_val) > 0:
-            boot_val = int(boot_val) * 1024
-
-        unit = 'b'
-
-    elif unit == 'MB':
-        if int(raw_val) > 0:
-            raw_val = int(raw_val) * 1024 * 1024
-        if int(boot_val) > 0:
-            boot_val = int(boot_val) * 1024 * 1024
-
-        unit = 'b'
-
-    return {
-        'current_val': val[name],
-        'raw_val': raw_val,
-        'unit': unit,
-        'boot_val': boot_val,
-        'context': context,
-    }
-
-
-def pretty_to_bytes(pretty_val):
-    # The function returns a value in bytes
-    # if the value contains 'B', 'kB', 'MB', 'GB', 'TB'.
-    # Otherwise it returns the passed argument.
-
-    # It's sometimes possible to have an empty values
-    if not pretty_val:
-        return pretty_val
-
-    # If the first char is not a digit, it does not make sense
-    # to parse further, so just return a passed value
-    if not pretty_val[0].isdigit():
-        return pretty_val
-
-    # If the last char is not an alphabetical symbol, it means that
-    # it does not contain any suffixes, so no sense to parse further
-    if not pretty_val[-1].isalpha():
-        try:
-            pretty_val = int(pretty_val)
-
-        except ValueError:
-            pretty_val = float(pretty_val)
-
-        return pretty_val
-
-    # Extract digits
-    num_part = []
-    for c in pretty_val:
-        # When we reach the first non-digit element,
-        # e.g. in 1024kB, stop iterating
-        if not c.isdigit():
-            break
-        else:
-            num_part.append(c)
-
-    num_part = int(''.join(num_part))
-
-    val_in_bytes = None
-
-    if len(pretty_val) >= 2:
-        if 'kB' in pretty_val[-2:]:
-            val_in_bytes = num_part * 1024
+    return info
 
-        elif 'MB' in pretty_val[-2:]:
-            val_in_bytes = num_part * 1024 * 1024
 
-        elif 'GB' in pretty_val[-2:]:
-            val_in_bytes = num_part * 1024 * 1024 * 1024
+def param_get_reloaded(cursor, module, name, conf_load_time):
+    try:
+        settings = get_reloaded_settings(cursor, [name], conf_load_time)
 
-        elif 'TB' in pretty_val[-2:]:
-            val_in_bytes = num_part * 1024 * 1024 * 1024 * 1024
+    except Exception as e:
+        module.fail_json(msg="Unable to get %s value due to : %s" % (name, to_native(e)))
 
-    # For cases like "1B"
-    if not val_in_bytes and 'B' in pretty_val[-1]:
-        val_in_bytes = num_part
+    if settings is None:
+        return None
 
-    if val_in_bytes is not None:
-        return val_in_bytes
-    else:
-        return pretty_val
+    return settings[name]
 
 
 def param_set(cursor, module, name, value, context):
+    # Returns the time the session loaded the configuration
+    # before the reload or None if it has not been reloaded
+    conf_load_time = None
     try:
-        if str(value).lower() == 'default':
-            query = "ALTER SYSTEM SET %s = DEFAULT" % name
-        else:
-            query = "ALTER SYSTEM SET %s = '%s'" % (name, value)
-        cursor.execute(query)
+        alter_system(cursor, name, value)
 
+        # Don't send it in one query string with ALTER SYSTEM: several
+        # statements in one string are executed in an implicit transaction
+        # block, and ALTER SYSTEM cannot run inside a transaction block
         if context != 'postmaster':
-            cursor.execute("SELECT pg_reload_conf()")
+            conf_load_time = reload_conf(cursor)
 
     except Exception as e:
         module.fail_json(msg="Unable to get %s value due to : %s" % (name, to_native(e)))
 
-    return True
+    return conf_load_time
 
 
 # ===========================================
@@ -354,17 +274,13 @@ def main():
     trust_input = module.params['trust_input']
 
     if not trust_input:
-        # Check input for potentially dangerous elements:
-        check_input(module, name, value, session_role)
+        # Check input for potentially dangerous elements.
+        # The name and value are passed to ALTER SYSTEM
+        # as a quoted identifier and a query parameter:
+        check_input(module, session_role)
 
     if value:
-        # Convert a value like 1mb (Postgres does not support) to 1MB, etc:
-        if len(value) > 2 and value[:-2].isdigit() and value[-2:] in LOWERCASE_SIZE_UNITS:
-            value = value.upper()
-
-        # Convert a value like 1b (Postgres does not support) to 1B:
-        elif len(value) > 1 and ('b' in value[-1] and value[:-1].isdigit()):
-            value = value.upper()
+        value = normalize_size_unit(value)
 
     if value is not None and reset:
         module.fail_json(msg="%s: value and reset params are mutually exclusive" % name)
@@ -376,7 +292,7 @@ def main():
     ensure_required_libs(module)
     conn_params = get_conn_params(module, module.params, warn_db_default=False)
     db_connection, dummy = connect_to_db(module, conn_params, autocommit=True)
-    cursor = db_connection.cursor(cursor_factory=DictCursor)
+    cursor = db_connection.cursor()
 
     kw = {}
     # Check server version (needs 9.4 or later):
@@ -414,7 +330,7 @@ def main():
         value = 'off'
 
     kw['prev_val_pretty'] = current_val
-    kw['value_pretty'] = deepcopy(kw['prev_val_pretty'])
+    kw['value_pretty'] = kw['prev_val_pretty']
     kw['context'] = context
 
     # Do job
@@ -427,13 +343,16 @@ def main():
 
     # If check_mode, just compare and exit:
     if module.check_mode:
-        if pretty_to_bytes(value) == pretty_to_bytes(current_val):
-            kw['changed'] = False
-
-        else:
+        if value is not None and not is_same_value(value, current_val):
             kw['value_pretty'] = value
             kw['changed'] = True
 
+        elif reset:
+            kw['changed'] = raw_val != boot_val
+
+        else:
+            kw['changed'] = False
+
         # Anyway returns current raw value in the check_mode:
         kw['value'] = dict(
             value=raw_val,
@@ -443,8 +362,9 @@ def main():
         module.exit_json(**kw)
 
     # Set param (value can be an empty string):
-    if value is not None and value != current_val:
-        changed = param_set(cursor, module, name, value, context)
+    if value is not None and not is_same_value(value, current_val):
+        conf_load_time = param_set(cursor, module, name, value, context)
+        changed = True
 
         kw['value_pretty'] = value
 
@@ -458,17 +378,33 @@ def main():
             )
             module.exit_json(**kw)
 
-        changed = param_set(cursor, module, name, boot_val, context)
+        conf_load_time = param_set(cursor, module, name, boot_val, context)
+        changed = True
 
-    cursor.close()
-    db_connection.close()
+    if not changed:
+        # Nothing has been set, so there is nothing to recheck:
+        kw['value'] = dict(
+            value=raw_val,
+            unit=unit,
+        )
+
+    # Recheck current value:
+    elif context in ('sighup', 'superuser-backend', 'backend', 'superuser', 'user'):
+        res = None
+        # pg_reload_conf() is applied to the current session,
+        # but settings with backend contexts can only change in new sessions:
+        if context not in ('superuser-backend', 'backend'):
+            res = param_get_reloaded(cursor, module, name, conf_load_time)
+
+        if res is None:
+            cursor.close()
+            db_connection.close()
 
-    # Reconnect and recheck current value:
-    if context in ('sighup', 'superuser-backend', 'backend', 'superuser', 'user'):
-        db_connection, dummy = connect_to_db(module, conn_params, autocommit=True)
-        cursor = db_connection.cursor(cursor_factory=DictCursor)
+            db_connection, dummy = connect_to_db(module, conn_params, autocommit=True)
+            cursor = db_connection.cursor()
+
+            res = param_get(cursor, module, name)
 
-        res = param_get(cursor, module, name)
         # f_ means 'final'
         f_value = res['current_val']
         f_raw_val = res['raw_val']
@@ -485,8 +421,8 @@ def main():
             unit=unit,
         )
 
-        cursor.close()
-        db_connection.close()
+    cursor.close()
+    db_connection.close()
 
     kw['changed'] = changed
     kw['restart_required'] = restart_required
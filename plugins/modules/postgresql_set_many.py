@@ -0,0 +1,366 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = r'''
+---
+module: postgresql_set_many
+short_description: Change several PostgreSQL server configuration parameters at once
+description:
+   - Allows to change several PostgreSQL server configuration parameters in one task.
+   - Works like M(community.postgresql.postgresql_set) but uses one database connection
+     for all the parameters and reloads the server configuration only once,
+     after all the parameters have been changed.
+   - The module uses ALTER SYSTEM command which writes the given parameter settings to the
+     $PGDATA/postgresql.auto.conf file, which is read in addition to postgresql.conf.
+version_added: '2.3.0'
+options:
+  params:
+    description:
+    - Dictionary where keys are names of PostgreSQL server parameters and values are values to set.
+    - Pay attention that parameters are case sensitive (see examples below).
+    - Values must be strings, numbers or booleans. Lists and dictionaries are not allowed,
+      pass values of list parameters like I(shared_preload_libraries) as one string
+      the same way as for M(community.postgresql.postgresql_set),
+      for example, C(pg_stat_statements, auto_explain).
+    - To remove a parameter string from postgresql.auto.conf, pass C(default) as its value.
+      With C(default) the parameter is always reported as changed in the check mode
+      and for parameters with the C(postmaster) context. For other parameters it is
+      reported as changed only if their value has actually changed after the reload.
+    type: dict
+    required: true
+  session_role:
+    description:
+    - Switch to session_role after connecting. The specified session_role must
+      be a role that the current login_user is a member of.
+    - Permissions checking for SQL commands is carried out as though
+      the session_role were the one that had logged in originally.
+    type: str
+  db:
+    description:
+    - Name of database to connect.
+    type: str
+    aliases:
+    - login_db
+  trust_input:
+    description:
+    - If C(false), check whether the value of I(session_role) is potentially dangerous.
+    - Names and values of parameters are not checked because they are always passed
+      to ALTER SYSTEM as a quoted identifier and a query parameter.
+    - It makes sense to use C(false) only when SQL injections are possible.
+    type: bool
+    default: true
+notes:
+- Supported version of PostgreSQL is 9.4 and later.
+- Supports C(check_mode).
+- Before any of the parameters is changed, the module only checks that all of them exist
+  and do not have the 'internal' context. Then they are set in alphabetical order and their
+  values are checked by ALTER SYSTEM, so if it fails for one of the parameters, the parameters
+  set before it stay written to postgresql.auto.conf without reloading the configuration.
+  Their names are listed in the error message.
+- Pay attention, change setting with 'postmaster' context can return changed is true
+  when actually nothing changes because the same value may be presented in
+  several different form, for example, 1024MB, 1GB, etc. However in pg_settings
+  system view it can be defined like 131072 number of 8kB pages.
+  The final check of the parameter value cannot compare it because the server was
+  not restarted and the value in pg_settings is not updated yet.
+- For some parameters restart of PostgreSQL server is required.
+  See official documentation U(https://www.postgresql.org/docs/current/view-pg-settings.html).
+seealso:
+- module: community.postgresql.postgresql_set
+- module: community.postgresql.postgresql_info
+- name: PostgreSQL server configuration
+  description: General information about PostgreSQL server configuration.
+  link: https://www.postgresql.org/docs/current/runtime-config.html
+- name: PostgreSQL view pg_settings reference
+  description: Complete reference of the pg_settings view documentation.
+  link: https://www.postgresql.org/docs/current/view-pg-settings.html
+- name: PostgreSQL ALTER SYSTEM command reference
+  description: Complete reference of the ALTER SYSTEM command documentation.
+  link: https://www.postgresql.org/docs/current/sql-altersystem.html
+author:
+- Andrew Klychkov (@Andersson007)
+extends_documentation_fragment:
+- community.postgresql.postgres
+
+'''
+
+EXAMPLES = r'''
+- name: Set several parameters and show what's been changed
+  community.postgresql.postgresql_set_many:
+    params:
+      work_mem: 32mb
+      maintenance_work_mem: 256MB
+      log_min_duration_statement: 1s
+      shared_buffers: 1GB
+  register: set
+
+- name: Print the changed parameters
+  ansible.builtin.debug:
+    msg: "{{ item.key }} {{ item.value.prev_val_pretty }} >> {{ item.value.value_pretty }}"
+  loop: "{{ set.params | dict2items }}"
+  when: item.value.changed
+
+- name: Remove parameters from postgresql.auto.conf (careful, TimeZone is case sensitive)
+  community.postgresql.postgresql_set_many:
+    params:
+      wal_log_hints: default
+      TimeZone: default
+'''
+
+RETURN = r'''
+restart_required:
+  description: Shows if restart of PostgreSQL server is required for any of the changed parameters.
+  returned: always
+  type: bool
+  sample: true
+params:
+  description:
+  - Dictionary where keys are names of the passed parameters and values are dictionaries
+    with information about them.
+  - Every dictionary contains the same keys as the M(community.postgresql.postgresql_set) module returns
+    (C(prev_val_pretty), C(value_pretty), C(value), C(context), C(restart_required))
+    and the C(changed) key.
+  - Returns the current values in the check mode.
+  returned: always
+  type: dict
+  sample: {
+    "work_mem": {
+      "changed": true,
+      "context": "user",
+      "prev_val_pretty": "4MB",
+      "restart_required": false,
+      "value": { "unit": "b", "value": 33554432 },
+      "value_pretty": "32MB"
+    }
+  }
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.community.postgresql.plugins.module_utils.database import (
+    check_input,
+)
+from ansible_collections.community.postgresql.plugins.module_utils.pg_settings import (
+    alter_system,
+    get_reloaded_settings,
+    get_settings,
+    is_same_value,
+    normalize_size_unit,
+    reload_conf,
+)
+from ansible_collections.community.postgresql.plugins.module_utils.postgres import (
+    connect_to_db,
+    ensure_required_libs,
+    get_conn_params,
+    postgres_common_argument_spec,
+)
+from ansible.module_utils.six import iteritems
+from ansible.module_utils._text import to_native
+
+PG_REQ_VER = 90400
+
+# ===========================================
+# PostgreSQL module specific support methods.
+#
+
+
+def params_get(cursor, module, names):
+    try:
+        settings = get_settings(cursor, names)
+
+    except Exception as e:
+        module.fail_json(msg="Unable to get values of %s due to : %s" % (', '.join(names), to_native(e)))
+
+    missing = [name for name in names if name not in settings]
+    if missing:
+        module.fail_json(msg="No such parameters: %s. "
+                             "Please check their spelling or presence in your PostgreSQL version "
+                             "(https://www.postgresql.org/docs/current/runtime-config.html)" % ', '.join(missing))
+
+    return settings
+
+
+def params_get_reloaded(cursor, module, names, conf_load_time):
+    try:
+        return get_reloaded_settings(cursor, names, conf_load_time)
+
+    except Exception as e:
+        module.fail_json(msg="Unable to get values of %s due to : %s" % (', '.join(names), to_native(e)))
+
+
+def params_set(cursor, module, values, needs_reload):
+    # Returns the time the session loaded the configuration
+    # before the reload or None if it has not been reloaded
+    written = []
+    for name, value in values:
+        try:
+            alter_system(cursor, name, value)
+
+        except Exception as e:
+            msg = "Unable to set %s value due to : %s" % (name, to_native(e))
+            if written:
+                msg += ("; %s already written to postgresql.auto.conf, "
+                        "the configuration has not been reloaded" % ', '.join(written))
+            module.fail_json(msg=msg)
+
+        written.append(name)
+
+    if not needs_reload:
+        return None
+
+    try:
+        return reload_conf(cursor)
+
+    except Exception as e:
+        module.fail_json(msg="Unable to reload server configuration due to : %s" % to_native(e))
+
+
+# ===========================================
+# Module execution.
+#
+
+
+def main():
+    argument_spec = postgres_common_argument_spec()
+    argument_spec.update(
+        params=dict(type='dict', required=True),
+        db=dict(type='str', aliases=['login_db']),
+        session_role=dict(type='str'),
+        trust_input=dict(type='bool', default=True),
+    )
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+    )
+
+    session_role = module.params['session_role']
+    trust_input = module.params['trust_input']
+
+    if not trust_input:
+        # Check input for potentially dangerous elements.
+        # Names and values are passed to ALTER SYSTEM
+        # as quoted identifiers and query parameters:
+        check_input(module, session_role)
+
+    if not module.params['params']:
+        module.fail_json(msg="params must contain at least one parameter")
+
+    values = {}
+    for name, value in iteritems(module.params['params']):
+        if value is None:
+            module.fail_json(msg="%s: value must be specified" % name)
+
+        if isinstance(value, (list, dict)):
+            module.fail_json(msg="%s: value must be a string, a number or a boolean, "
+                                 "got %s" % (name, type(value).__name__))
+
+        value = normalize_size_unit(to_native(value))
+
+        if value == 'True':
+            value = 'on'
+        elif value == 'False':
+            value = 'off'
+
+        values[name] = value
+
+    names = sorted(values)
+
+    # Ensure psycopg2 libraries are available before connecting to DB:
+    ensure_required_libs(module)
+    conn_params = get_conn_params(module, module.params, warn_db_default=False)
+    db_connection, dummy = connect_to_db(module, conn_params, autocommit=True)
+    cursor = db_connection.cursor()
+
+    # Check server version (needs 9.4 or later):
+    ver = db_connection.server_version
+    if ver < PG_REQ_VER:
+        module.warn("PostgreSQL is %s version but %s or later is required" % (ver, PG_REQ_VER))
+        db_connection.close()
+        module.exit_json(changed=False, restart_required=False, params={})
+
+    # Get info about params state with one query:
+    settings = params_get(cursor, module, names)
+
+    internal = [name for name in names if settings[name]['context'] == 'internal']
+    if internal:
+        module.fail_json(msg="%s: cannot be changed (internal context). See "
+                             "https://www.postgresql.org/docs/current/runtime-config-preset.html" % ', '.join(internal))
+
+    kw = {}
+    to_change = []
+    for name in names:
+        res = settings[name]
+
+        kw[name] = dict(
+            changed=False,
+            context=res['context'],
+            prev_val_pretty=res['current_val'],
+            restart_required=res['context'] == 'postmaster',
+            value=dict(
+                value=res['raw_val'],
+                unit=res['unit'],
+            ),
+            value_pretty=res['current_val'],
+        )
+
+        # Value can be an empty string:
+        if not is_same_value(values[name], res['current_val']):
+            to_change.append(name)
+            kw[name]['changed'] = True
+            kw[name]['value_pretty'] = values[name]
+
+    if to_change and not module.check_mode:
+        # Change all the params first and reload the configuration once:
+        needs_reload = any(settings[name]['context'] != 'postmaster' for name in to_change)
+        conf_load_time = params_set(cursor, module, [(name, values[name]) for name in to_change], needs_reload)
+
+        # Recheck current values:
+        to_check = [name for name in to_change
+                    if settings[name]['context'] in ('sighup', 'superuser-backend', 'backend', 'superuser', 'user')]
+
+        if to_check:
+            # f_ means 'final'
+            f_settings = None
+            # pg_reload_conf() is applied to the current session,
+            # but settings with backend contexts can only change in new sessions:
+            if all(settings[name]['context'] not in ('superuser-backend', 'backend') for name in to_check):
+                f_settings = params_get_reloaded(cursor, module, to_check, conf_load_time)
+
+            if f_settings is None:
+                cursor.close()
+                db_connection.close()
+
+                db_connection, dummy = connect_to_db(module, conn_params, autocommit=True)
+                cursor = db_connection.cursor()
+
+                f_settings = params_get(cursor, module, to_check)
+
+            for name in to_check:
+                f_res = f_settings[name]
+
+                kw[name]['changed'] = settings[name]['raw_val'] != f_res['raw_val']
+                kw[name]['value_pretty'] = f_res['current_val']
+                kw[name]['value'] = dict(
+                    value=f_res['raw_val'],
+                    unit=f_res['unit'],
+                )
+
+    cursor.close()
+    db_connection.close()
+
+    changed = any(res['changed'] for res in kw.values())
+    restart_required = [name for name in names if kw[name]['restart_required'] and kw[name]['changed']]
+
+    if restart_required:
+        module.warn("Restart of PostgreSQL is required for settings %s" % ', '.join(restart_required))
+
+    module.exit_json(changed=changed, restart_required=bool(restart_required), params=kw)
+
+
+if __name__ == '__main__':
+    main()
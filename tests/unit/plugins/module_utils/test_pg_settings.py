@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Copyright: Contributors to the Ansible project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from datetime import datetime
+
+import pytest
+
+import ansible_collections.community.postgresql.plugins.module_utils.pg_settings as pg_settings
+from ansible_collections.community.postgresql.plugins.module_utils.pg_settings import (
+    get_reloaded_settings,
+    is_same_value,
+    normalize_size_unit,
+    quote_name,
+    reload_conf,
+)
+
+OLD_LOAD_TIME = datetime(2022, 8, 1, 10, 0, 0)
+NEW_LOAD_TIME = datetime(2022, 8, 1, 10, 0, 1)
+NEWER_LOAD_TIME = datetime(2022, 8, 1, 10, 0, 2)
+
+
+class FakeCursor():
+
+    """
+    Cursor returning a work_mem row loaded at the passed times one by one.
+    """
+
+    def __init__(self, load_times):
+        self.load_times = list(load_times)
+        self.executed = 0
+
+    def execute(self, query, params=None):
+        self.executed += 1
+
+    def fetchone(self):
+        # Result of SELECT pg_reload_conf(), pg_conf_load_time()
+        return (True, self.load_times.pop(0))
+
+    def fetchall(self):
+        load_time = self.load_times.pop(0)
+        return [('work_mem', '8192', 'kB', 'user', '4096', '8MB', load_time, 8388608, 4194304)]
+
+
+@pytest.mark.parametrize('input_,expected', [
+    ('', ''),
+    ('on', 'on'),
+    ('100', '100'),
+    ('1b', '1B'),
+    ('1B', '1B'),
+    ('1kb', '1kB'),
+    ('1KB', '1kB'),
+    ('1kB', '1kB'),
+    ('32mb', '32MB'),
+    ('1gB', '1GB'),
+    ('1tb', '1TB'),
+    ('10min', '10min'),
+    ('100ms', '100ms'),
+    ('mb', 'mb'),
+]
+)
+def test_normalize_size_unit(input_, expected):
+    assert normalize_size_unit(input_) == expected
+
+
+@pytest.mark.parametrize('value,current_val,expected', [
+    ('', '', True),
+    ('on', 'on', True),
+    ('on', 'off', False),
+    ('default', '4MB', False),
+    ('64MB', '64MB', True),
+    ('65536kB', '64MB', True),
+    ('1GB', '1024MB', True),
+    ('2.0', '2', True),
+    ('65MB', '64MB', False),
+    ('67108864', '64MB', False),
+    ('10min', '600s', False),
+]
+)
+def test_is_same_value(value, current_val, expected):
+    assert is_same_value(value, current_val) == expected
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(pg_settings.time, 'sleep', lambda seconds: None)
+
+
+def test_get_reloaded_settings(no_sleep):
+    cursor = FakeCursor([NEW_LOAD_TIME])
+    settings = get_reloaded_settings(cursor, ['work_mem'], OLD_LOAD_TIME)
+
+    assert cursor.executed == 1
+    assert settings['work_mem']['current_val'] == '8MB'
+    assert settings['work_mem']['raw_val'] == 8388608
+    assert settings['work_mem']['unit'] == 'b'
+
+
+def test_get_reloaded_settings_late_reload(no_sleep):
+    cursor = FakeCursor([OLD_LOAD_TIME, OLD_LOAD_TIME, NEW_LOAD_TIME])
+    settings = get_reloaded_settings(cursor, ['work_mem'], OLD_LOAD_TIME)
+
+    assert cursor.executed == 3
+    assert settings['work_mem']['conf_load_time'] == NEW_LOAD_TIME
+
+
+def test_get_reloaded_settings_no_reload(no_sleep):
+    cursor = FakeCursor([OLD_LOAD_TIME] * pg_settings.CONF_RELOAD_ATTEMPTS)
+
+    assert get_reloaded_settings(cursor, ['work_mem'], OLD_LOAD_TIME) is None
+    assert cursor.executed == pg_settings.CONF_RELOAD_ATTEMPTS
+
+
+def test_get_reloaded_settings_concurrent_reload(no_sleep):
+    # Another client reloaded the configuration after the settings were read
+    # for the first time, so the session re-read it before reload_conf()
+    # and the first recheck still returns the values from before the reload:
+    cursor = FakeCursor([NEW_LOAD_TIME, NEW_LOAD_TIME, NEWER_LOAD_TIME])
+    conf_load_time = reload_conf(cursor)
+
+    assert conf_load_time == NEW_LOAD_TIME
+
+    settings = get_reloaded_settings(cursor, ['work_mem'], conf_load_time)
+
+    assert cursor.executed == 3
+    assert settings['work_mem']['conf_load_time'] == NEWER_LOAD_TIME
+
+
+@pytest.mark.parametrize('input_,expected', [
+    ('work_mem', '"work_mem"'),
+    ('TimeZone', '"TimeZone"'),
+    ('pg_stat_statements.max', '"pg_stat_statements"."max"'),
+    ('a"b', '"a""b"'),
+]
+)
+def test_quote_name(input_, expected):
+    assert quote_name(input_) == expected
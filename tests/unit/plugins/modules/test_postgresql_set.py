@@ -6,7 +6,7 @@ __metaclass__ = type
 
 import pytest
 
-from ansible_collections.community.postgresql.plugins.modules.postgresql_set import pretty_to_bytes
+from ansible_collections.community.postgresql.plugins.module_utils.pg_settings import pretty_to_bytes
 
 
 @pytest.mark.parametrize('input_,expected', [
@@ -21,6 +21,11 @@ from ansible_collections.community.postgresql.plugins.modules.postgresql_set imp
     ('100MB', 104857600),
     ('1GB', 1073741824),
     ('10GB', 10737418240),
+    ('1TB', 1099511627776),
+    ('0.5GB', 536870912),
+    ('-1', '-1'),
+    ('10min', '10min'),
+    ('on', 'on'),
 ]
 )
 def test_pretty_to_bytes(input_, expected):